@@ -5,6 +5,7 @@ from OpenAPI/Swagger specifications.
 """
 import streamlit as st
 import json
+import pandas as pd
 from parsers import swagger_to_tools
 from generators import generate_mcp_code, auto_generate_prompts
 
@@ -21,10 +22,119 @@ if "models" not in st.session_state:
     st.session_state.models = {}
 if "swagger_text" not in st.session_state:
     st.session_state.swagger_text = ""
-if "swagger_selection" not in st.session_state:
-    st.session_state.swagger_selection = {}
+if "swagger_selection_df" not in st.session_state:
+    st.session_state.swagger_selection_df = None
 if "all_swagger_tools" not in st.session_state:
     st.session_state.all_swagger_tools = []
+if "secrets" not in st.session_state:
+    st.session_state.secrets = []
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _parse_spec(swagger_text):
+    """Parse a spec once per distinct text; reloading the same spec skips the parser."""
+    return swagger_to_tools(swagger_text)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _render_server_code(api_name, tools_json, prompts_json, models_json, use_httpx=False):
+    """Render server code; JSON string arguments make the inputs hashable cache keys."""
+    return generate_mcp_code(api_name, json.loads(tools_json), json.loads(prompts_json), json.loads(models_json), use_httpx)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _claude_config_json(api_name, filename, secrets):
+    """Serialized Claude Desktop config for the server."""
+    config = {"mcpServers": {api_name.lower(): {"command": "python3", "args": [filename], "env": {s: "YOUR_ACTUAL_TOKEN" for s in secrets}}}}
+    return json.dumps(config, indent=2)
+
+
+@st.fragment
+def _step3_fragment(api_name, tools, prompts, models, secrets):
+    """Step 3 output; reruns independently of the rest of the page."""
+    filename = f"{api_name.lower()}_server.py"
+    use_httpx = st.toggle("Use pooled HTTP/2 client (httpx)", key="use_httpx",
+                          help="Generated server uses httpx with HTTP/2 multiplexing instead of a requests session.")
+    deps = "fastmcp \"httpx[http2]\" pydantic orjson" if use_httpx else "fastmcp requests pydantic urllib3 orjson"
+    render_args = (api_name, json.dumps(tools), json.dumps(prompts), json.dumps(models), use_httpx)
+    # Reuse the last rendered code directly when inputs are unchanged
+    if st.session_state.get("_code_args") == render_args:
+        code = st.session_state["_code"]
+    else:
+        code = _render_server_code(*render_args)
+        st.session_state["_code_args"] = render_args
+        st.session_state["_code"] = code
+
+    st.download_button("💾 Download Python Server", code, filename, type="primary")
+    with st.expander("Preview generated code", expanded=False):
+        st.code(code, language="python")
+
+    t1, t2, t3, t4 = st.tabs(["Local Execution", "Claude Desktop", "Dockerfile", "Docker Compose"])
+
+    with t1:
+        local_cmd = f"""# Create virtual environment (recommended)
+python3 -m venv venv
+source venv/bin/activate  # macOS/Linux or: venv\\Scripts\\activate (Windows)
+
+# Install dependencies
+pip install {deps}
+
+# Set authentication (if needed)"""
+        if secrets:
+            for s in secrets:
+                local_cmd += f"\nexport {s}='your-token-here'"
+        local_cmd += f"\n\n# Run the MCP server\npython3 {filename}"
+        st.code(local_cmd)
+
+    with t2:
+        st.markdown("**File location:** `~/.config/Claude/claude_desktop_config.json` (or `%APPDATA%\\\\Claude\\\\claude_desktop_config.json` on Windows)")
+        st.code(_claude_config_json(api_name, filename, tuple(secrets)), language="json")
+        st.info("💡 Replace 'YOUR_ACTUAL_TOKEN' values with your real credentials before using in Claude Desktop.")
+
+    with t3:
+        env_vars = ""
+        if secrets:
+            env_vars = "\n".join([f"ENV {s}=YOUR_TOKEN_{i}" for i, s in enumerate(secrets)])
+            env_vars = "\n" + env_vars + "\n"
+        dockerfile = f"""FROM python:3.11-slim
+WORKDIR /app
+
+# Install dependencies
+RUN pip install --no-cache-dir {deps}
+
+# Copy server file
+COPY {filename} .
+{env_vars if env_vars else ""}
+# Run with python3 explicitly
+CMD ["python3", "{filename}"]"""
+        st.code(dockerfile, "dockerfile")
+        st.download_button("💾 Download Dockerfile", dockerfile, "Dockerfile", type="primary")
+
+    with t4:
+        compose = f"""version: '3.8'
+services:
+  mcp:
+    build: .
+    container_name: {api_name.lower()}_server
+    environment:
+"""
+        if secrets:
+            compose += "\n".join(f"      - {s}=${{{s}}}" for s in secrets)
+        else:
+            compose += "      {}"
+        compose += "\n    restart: unless-stopped"
+        st.code(compose, "yaml")
+        st.download_button("💾 Download docker-compose.yml", compose, "docker-compose.yml", type="primary")
+        
+        st.markdown("### .env file (create in same directory):")
+        env_content = ""
+        if secrets:
+            env_content = "\n".join([f"{s}=your_actual_token_here" for s in secrets])
+        else:
+            env_content = "# No authentication required"
+        st.code(env_content, "bash")
+        st.markdown("**Run with:** `docker-compose up -d`")
+
 
 # Page configuration
 st.set_page_config(page_title="MCP Forge Pro", layout="wide", page_icon="⚙️")
@@ -39,7 +149,7 @@ with st.sidebar:
         st.session_state.prompts = []
         st.session_state.models = {}
         st.session_state.api_name = "MyAPI"
-        st.session_state.swagger_selection = {}
+        st.session_state.swagger_selection_df = None
         st.session_state.swagger_text = ""
         st.session_state.step = 0
         st.rerun()
@@ -49,7 +159,7 @@ with st.sidebar:
         st.session_state.prompts = []
         st.session_state.models = {}
         st.session_state.api_name = "MyAPI"
-        st.session_state.swagger_selection = {}
+        st.session_state.swagger_selection_df = None
         st.session_state.swagger_text = ""
         st.session_state.step = 1
         st.rerun()
@@ -154,13 +264,13 @@ elif st.session_state.step == 1:
             
             if st.button("📥 Load APIs", key="load_swagger", type="primary", disabled=not st.session_state.swagger_text.strip()):
                 try:
-                    tools, models = swagger_to_tools(st.session_state.swagger_text)
+                    tools, models = _parse_spec(st.session_state.swagger_text)
                     if not tools:
                         st.warning("⚠️ No API endpoints found in the Swagger/OpenAPI spec. Please check the file and make sure it contains valid paths.")
                     else:
                         st.session_state.all_swagger_tools = tools
                         st.session_state.models.update(models)
-                        st.session_state.swagger_selection = {t["name"]: False for t in tools}
+                        st.session_state.swagger_selection_df = None
                         st.session_state.swagger_text = ""
                         st.success(f"✅ Loaded {len(tools)} API endpoints from Swagger")
                         st.rerun()
@@ -170,12 +280,26 @@ elif st.session_state.step == 1:
         if "all_swagger_tools" in st.session_state and st.session_state.all_swagger_tools:
             st.info("✅ APIs loaded successfully! Select the ones you want to add below.")
             st.markdown("### ✅ Select APIs to Add as Tools")
-            for idx, t in enumerate(st.session_state.all_swagger_tools):
-                label = f"**{t['method']}** `{t['url']}` — {t['desc']}"
-                st.session_state.swagger_selection[t["name"]] = st.checkbox(label, value=st.session_state.swagger_selection.get(t["name"], False), key=f"cb_swagger_{idx}_{t['name']}")
+            # Single editable table instead of one checkbox widget per endpoint. Its input is
+            # built once per loaded spec: data_editor derives its widget id from the data, so
+            # feeding edits back into it would reset the widget on every click
+            if st.session_state.swagger_selection_df is None:
+                st.session_state.swagger_selection_df = pd.DataFrame([
+                    {"select": False, "method": t["method"], "url": t["url"], "desc": t["desc"], "name": t["name"]}
+                    for t in st.session_state.all_swagger_tools
+                ])
+            edited_df = st.data_editor(
+                st.session_state.swagger_selection_df,
+                disabled=["method", "url", "desc", "name"],
+                column_config={"select": st.column_config.CheckboxColumn("Add", default=False)},
+                hide_index=True,
+                use_container_width=True,
+                key="swagger_selection_editor"
+            )
+            selected_names = set(edited_df.loc[edited_df["select"], "name"])
 
             if st.button("⚙️ Generate Selected Tools", key="generate_tools_selected", type="primary"):
-                selected_tools = [t for t in st.session_state.all_swagger_tools if st.session_state.swagger_selection.get(t["name"], False)]
+                selected_tools = [t for t in st.session_state.all_swagger_tools if t["name"] in selected_names]
                 existing_tool_names = {t["name"] for t in st.session_state.tools}
                 new_tools = [t for t in selected_tools if t["name"] not in existing_tool_names]
                 st.session_state.tools.extend(new_tools)
@@ -252,6 +376,8 @@ elif st.session_state.step == 1:
                 st.rerun()
         with col2:
             if st.button("Next ➡️", key="next_step1", type="primary"):
+                # Tools are final for Steps 2-3; compute required env vars once
+                st.session_state.secrets = list(dict.fromkeys(t["auth_val"] for t in st.session_state.tools if t["auth"] != "None"))
                 st.session_state.step = 2
                 st.rerun()
 
@@ -349,80 +475,13 @@ elif st.session_state.step == 2:
 elif st.session_state.step == 3:
     st.header("3️⃣ Final MCP Server Code")
 
-    filename = f"{st.session_state.api_name.lower()}_server.py"
-    code = generate_mcp_code(st.session_state.api_name, st.session_state.tools, st.session_state.prompts, st.session_state.models)
-
-    st.code(code, language="python")
-    st.download_button("💾 Download Python Server", code, filename, type="primary")
-
-    secrets = list(set(t["auth_val"] for t in st.session_state.tools if t["auth"] != "None"))
-
-    t1, t2, t3, t4 = st.tabs(["Local Execution", "Claude Desktop", "Dockerfile", "Docker Compose"])
-
-    with t1:
-        local_cmd = f"""# Create virtual environment (recommended)
-python3 -m venv venv
-source venv/bin/activate  # macOS/Linux or: venv\\Scripts\\activate (Windows)
-
-# Install dependencies
-pip install fastmcp requests pydantic urllib3
-
-# Set authentication (if needed)"""
-        if secrets:
-            for s in secrets:
-                local_cmd += f"\nexport {s}='your-token-here'"
-        local_cmd += f"\n\n# Run the MCP server\npython3 {filename}"
-        st.code(local_cmd)
-
-    with t2:
-        st.markdown("**File location:** `~/.config/Claude/claude_desktop_config.json` (or `%APPDATA%\\\\Claude\\\\claude_desktop_config.json` on Windows)")
-        claude_config = {"mcpServers": {st.session_state.api_name.lower(): {"command": "python3", "args": [filename], "env": {s: "YOUR_ACTUAL_TOKEN" for s in secrets} if secrets else {}}}}
-        st.json(claude_config)
-        st.info("💡 Replace 'YOUR_ACTUAL_TOKEN' values with your real credentials before using in Claude Desktop.")
-
-    with t3:
-        env_vars = ""
-        if secrets:
-            env_vars = "\n".join([f"ENV {s}=YOUR_TOKEN_{i}" for i, s in enumerate(secrets)])
-            env_vars = "\n" + env_vars + "\n"
-        dockerfile = f"""FROM python:3.11-slim
-WORKDIR /app
-
-# Install dependencies
-RUN pip install --no-cache-dir fastmcp requests pydantic urllib3
-
-# Copy server file
-COPY {filename} .
-{env_vars if env_vars else ""}
-# Run with python3 explicitly
-CMD ["python3", "{filename}"]"""
-        st.code(dockerfile, "dockerfile")
-        st.download_button("💾 Download Dockerfile", dockerfile, "Dockerfile", type="primary")
-
-    with t4:
-        compose = f"""version: '3.8'
-services:
-  mcp:
-    build: .
-    container_name: {st.session_state.api_name.lower()}_server
-    environment:"""
-        if secrets:
-            for s in secrets:
-                compose += f"\n      - {s}=${{{s}}}"
-        else:
-            compose += "\n      {}"
-        compose += "\n    restart: unless-stopped"
-        st.code(compose, "yaml")
-        st.download_button("💾 Download docker-compose.yml", compose, "docker-compose.yml", type="primary")
-        
-        st.markdown("### .env file (create in same directory):")
-        env_content = ""
-        if secrets:
-            env_content = "\n".join([f"{s}=your_actual_token_here" for s in secrets])
-        else:
-            env_content = "# No authentication required"
-        st.code(env_content, "bash")
-        st.markdown("**Run with:** `docker-compose up -d`")
+    _step3_fragment(
+        st.session_state.api_name,
+        st.session_state.tools,
+        st.session_state.prompts,
+        st.session_state.models,
+        st.session_state.secrets
+    )
     
     st.markdown("---")
     st.subheader("🔄 Modify Your Configuration")
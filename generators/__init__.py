@@ -6,6 +6,7 @@ Exports code generation and prompt generation functions.
 from .code_generator import (
     generate_mcp_code,
     generate_rest_mcp_code,
+    write_rest_mcp_code,
     _create_session_with_retries,
     _extract_path_params,
     _to_dict,
@@ -16,6 +17,7 @@ from .prompt_generator import auto_generate_prompts
 __all__ = [
     "generate_mcp_code",
     "generate_rest_mcp_code",
+    "write_rest_mcp_code",
     "auto_generate_prompts",
     "_create_session_with_retries",
     "_extract_path_params",
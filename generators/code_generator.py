@@ -3,132 +3,37 @@ Code generation module for MCP servers.
 Generates FastMCP Python server code from tool and prompt definitions.
 """
 
+import functools
+import io
+import json
+import re
+from collections import defaultdict
 import requests
-from jinja2 import Template
-
-
-def _create_session_with_retries():
-    """
-    Create a requests Session with exponential backoff retry strategy.
-    Retries on connection errors and specified HTTP status codes.
-    """
-    session = requests.Session()
-    from urllib3.util.retry import Retry
-    from requests.adapters import HTTPAdapter
-    
-    retry_strategy = Retry(
-        total=3,
-        backoff_factor=0.5,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET", "POST", "PUT", "DELETE", "PATCH"]
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    return session
-
-
-def _extract_path_params(base_url, args):
-    """
-    Extract path parameters from URL template and substitute them.
-    Returns tuple of (final_url, remaining_args).
-    Path params like {id} are replaced with values from args dict.
-    """
-    import re
-    remaining = args.copy()
-    path_params = re.findall(r"{(.*?)}", base_url)
-    for param in path_params:
-        if param in remaining:
-            base_url = base_url.replace("{" + param + "}", str(remaining.pop(param)))
-    return base_url, remaining
-
-
-def _get_model_aliases(tools):
-    """
-    Identify tools that share the same model and generate alias assignments.
-    Returns dict mapping tool to (canonical_model, alias_name) tuple.
-    
-    Example:
-        CreateUserRequest and UpdateUserRequest both reference User model
-        Returns aliases for both pointing to the canonical User class
-    """
-    model_usage = {}  # model_name -> [tool_names]
-    aliases = {}  # tool_name -> (canonical_model, alias_for_tool)
-    
-    # Count which models are used by which tools
-    for tool in tools:
-        body_model = tool.get("body_model")
-        response_model = tool.get("response_model")
-        
-        if body_model:
-            if body_model not in model_usage:
-                model_usage[body_model] = []
-            model_usage[body_model].append((tool["name"], "request"))
-        
-        if response_model:
-            if response_model not in model_usage:
-                model_usage[response_model] = []
-            model_usage[response_model].append((tool["name"], "response"))
-    
-    # Generate aliases for models used by multiple tools
-    for model_name, usages in model_usage.items():
-        if len(usages) > 1:
-            # Multiple tools use this model - create aliases
-            for tool_name, usage_type in usages:
-                alias_name = f"{tool_name.title().replace('_','')}{'Request' if usage_type == 'request' else 'Response'}"
-                aliases[alias_name] = model_name
-    
-    return aliases
-
 
-def _to_dict(obj):
-    """
-    Convert Pydantic model or dict to plain dictionary.
-    Handles both Pydantic models (with .dict() method) and regular dicts.
-    """
-    if hasattr(obj, 'dict') and callable(obj.dict):
-        return obj.dict()
-    elif isinstance(obj, dict):
-        return obj
-    return obj
 
+# Matches {param} placeholders in URL templates
+_PATH_PARAM_RE = re.compile(r"\{([^}]+)\}")
 
-def generate_rest_mcp_code(api_name, tools, prompts, models):
-    """
-    Generate FastMCP server code for REST APIs only.
-    
-    Args:
-        api_name (str): Name of the MCP server
-        tools (list): List of REST tool definitions
-        prompts (list): List of prompt templates
-        models (dict): Dictionary of Pydantic model definitions
-    
-    Returns:
-        str: Complete Python source code for FastMCP REST server
-    """
-    used_models = {}
-    for tool in tools:
-        # Include request models
-        if tool.get("body_model"):
-            model_name = tool["body_model"]
-            if model_name in models:
-                used_models[model_name] = models[model_name]
-        # Include response models for typed responses
-        if tool.get("response_model"):
-            model_name = tool["response_model"]
-            if model_name in models:
-                used_models[model_name] = models[model_name]
-    
-    # Get model aliases for deduplication
-    model_aliases = _get_model_aliases(tools)
-    
-    template_str = """from mcp.server.fastmcp import FastMCP
+# Imports, models, helpers and server setup
+_SERVER_HEADER_TEMPLATE = """from mcp.server.fastmcp import FastMCP
+{% if use_httpx %}
+import httpx
+{% else %}
 import requests
-import re
+{% endif %}
 import os
 from pydantic import BaseModel, ValidationError
+{% if not use_httpx %}
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
+{% endif %}
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
 
 # ------------------ Pydantic Models ------------------
 {% for model, fields in models.items() %}
@@ -147,7 +52,35 @@ class {{ model }}(BaseModel):
 {% for alias_name, canonical_model in aliases.items() %}
 {{ alias_name }} = {{ canonical_model }}
 {% endfor %}
+
 # --------- HTTP Resilience & Helper Functions ---------
+{% if use_httpx %}
+def _query_value(value):
+    \"\"\"Encode a query value the way requests does: bools as True/False, None list items dropped.\"\"\"
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_query_value(item) for item in value if item is not None]
+    return value
+
+
+class _Client(httpx.Client):
+    \"\"\"httpx client sending the same query strings as the requests variant.\"\"\"
+    def request(self, method, url, *, params=None, **kwargs):
+        if params:
+            params = {key: _query_value(value) for key, value in params.items() if value is not None}
+        return super().request(method, url, params=params, **kwargs)
+
+
+def _create_session_with_retries():
+    # One pooled HTTP/2 client shared by all tools; retries cover connection failures
+    transport = httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=32)
+    )
+    return _Client(transport=transport, timeout=15)
+{% else %}
 def _create_session_with_retries():
     session = requests.Session()
     retry_strategy = Retry(
@@ -156,19 +89,11 @@ def _create_session_with_retries():
         status_forcelist=[429, 500, 502, 503, 504],
         allowed_methods=["GET", "POST", "PUT", "DELETE", "PATCH"]
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry_strategy)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
-
-def _extract_path_params(base_url, args):
-    \"\"\"Extract and substitute path parameters from URL.\"\"\"
-    remaining = args.copy()
-    path_params = re.findall(r"{(.*?)}", base_url)
-    for param in path_params:
-        if param in remaining:
-            base_url = base_url.replace("{" + param + "}", str(remaining.pop(param)))
-    return base_url, remaining
+{% endif %}
 
 def _to_dict(obj):
     \"\"\"Convert Pydantic model or dict to dict.\"\"\"
@@ -179,118 +104,132 @@ def _to_dict(obj):
     return obj
 
 _session = _create_session_with_retries()
+{% if auth_vars %}
+
+# --------- Auth (read once at import) ---------
+{% for const, var, default in auth_vars %}
+{{ const }} = os.environ.get('{{ var }}', '{{ default }}')
+{% endfor %}
+{% for const, literal in auth_headers %}
+{{ const }} = {{ literal }}
+{% endfor %}
+{% endif %}
 
 # Initialize FastMCP Server: {{ api_name }}
 mcp = FastMCP("{{ api_name }}")
+"""
 
-{% for tool in tools %}
-@mcp.tool()
-def {{ tool.name }}({% for arg, type in tool.args.items() %}{{ arg }}: {{ type }}{% if not loop.last %}, {% endif %}{% endfor %}):
-    \"\"\"{{ tool.desc }}\"\"\"
-    args_dict = { {% for arg in tool.args.keys() %}"{{ arg }}": {{ arg }}{% if not loop.last %}, {% endif %}{% endfor %} }
-    base_url, remaining_args = _extract_path_params("{{ tool.url }}", args_dict)
-
-    headers = {}
-    {% if tool.auth and tool.auth != 'None' %}
-    {% if tool.auth == 'Bearer Token' %}
-    headers["Authorization"] = f"Bearer {os.environ.get('{{ tool.auth_val }}', 'YOUR_TOKEN_HERE')}"
-    {% elif tool.auth == 'API Key (Header)' %}
-    headers["X-API-KEY"] = os.environ.get('{{ tool.auth_val }}', 'YOUR_KEY_HERE')
-    {% endif %}
-    {% endif %}
-
-    {% if tool.body_model %}
-    payload = remaining_args.pop("body", None)
-    {% endif %}
-
+# Rendered once per tool with str.format; the optional blocks below are
+# picked in Python, so only the server header goes through Jinja
+_TOOL_TEMPLATE = """@mcp.tool()
+def {name}({signature}):
+    \"\"\"{desc}\"\"\"
+    base_url = "{url}"
+{path_substitutions}
     try:
-        request_kwargs = {
-            "headers": headers,
-            "timeout": 15
-        }
-        
-        {% if tool.has_query_params %}
-        if remaining_args:
-            request_kwargs["params"] = remaining_args
-        {% endif %}
-        
-        {% if tool.body_model %}
-        if payload is not None:
-            payload_dict = _to_dict(payload)
-            {% if tool.has_file_fields %}
-            request_kwargs["files"] = payload_dict
-            {% else %}
-            request_kwargs["json"] = payload_dict
-            {% endif %}
-        {% endif %}
-        
-        response = _session.{{ tool.method.lower() }}(base_url, **request_kwargs)
+        response = _session.request(
+            "{method}",
+            base_url,
+{request_kwargs}            timeout=15
+        )
         response.raise_for_status()
         
         # Handle empty response (204 No Content is valid for some endpoints)
-        if response.status_code == 204 or not response.text or response.text.strip() == "":
-            return {"ok": True, "data": None, "message": "No content"}
+        if response.status_code == 204 or not response.content.strip():
+            return {{"ok": True, "data": None, "message": "No content"}}
         
         # Check content-type before parsing JSON
         content_type = response.headers.get('Content-Type', '')
-        if 'application/json' not in content_type:
-            return {
+        if not content_type.startswith('application/json'):
+            return {{
                 "ok": False,
-                "error": {
+                "error": {{
                     "type": "INVALID_CONTENT_TYPE",
-                    "details": f"Expected JSON but got: {content_type}",
+                    "details": f"Expected JSON but got: {{content_type}}",
                     "response_text": response.text[:500]
-                }
-            }
+                }}
+            }}
         
-        try:
-            response_data = response.json()
-        except ValueError as json_error:
-            return {
+{response_handling}    except Exception as e:
+        if hasattr(e, 'response') and e.response is not None:
+            return {{
                 "ok": False,
-                "error": {
-                    "type": "JSON_PARSE_ERROR",
-                    "details": str(json_error),
-                    "response_text": response.text[:500]
-                }
-            }
-        
-        # Validate and structure response with Pydantic model
-        {% if tool.response_model %}
+                "error": {{
+                    "type": "HTTP_ERROR",
+                    "details": {{
+                        "status_code": e.response.status_code,
+                        "body": e.response.text[:500]
+                    }}
+                }}
+            }}
+        else:
+            return {{
+                "ok": False,
+                "error": {{
+                    "type": "EXCEPTION",
+                    "details": str(e),
+                    "url_attempted": base_url
+                }}
+            }}
+"""
+
+# Auth header dicts are built once at import; keyed by the auth option shown in the UI
+_AUTH_HEADER_LITERALS = {
+    "Bearer Token": "{{\"Authorization\": f\"Bearer {{{auth_const}}}\"}}",
+    "API Key (Header)": "{{\"X-API-KEY\": {auth_const}}}",
+}
+
+# Suffix of the module-level header dict name, so one env var can back both auth types
+_AUTH_HEADER_SUFFIXES = {
+    "Bearer Token": "_BEARER_HEADERS",
+    "API Key (Header)": "_KEY_HEADERS",
+}
+
+# Request keyword arguments are only emitted when the tool needs them
+_HEADERS_KWARG = "            headers={headers_const},\n"
+
+# Placeholder used when the auth env var is unset, per auth type
+_AUTH_DEFAULTS = {
+    "Bearer Token": "YOUR_TOKEN_HERE",
+    "API Key (Header)": "YOUR_KEY_HERE",
+}
+
+# Query args are sent as a dict literal built straight from the parameters
+_QUERY_PARAMS_KWARG = "            params={{{query_args}}},\n"
+
+_BODY_KWARG = "            {payload_key}=_to_dict(body) if body is not None else None,\n"
+
+# Parsed straight from the response bytes into the model, skipping the
+# intermediate dict; malformed JSON is reported as JSON_PARSE_ERROR
+_RESPONSE_MODEL_BLOCK = """        # Validate and structure response with Pydantic model
         try:
-            # Ensure response_data is a dict
-            if not isinstance(response_data, dict):
-                return {
-                    "ok": False,
-                    "error": {
-                        "type": "VALIDATION_ERROR",
-                        "details": "Response data must be a JSON object",
-                        "actual_type": type(response_data).__name__
-                    }
-                }
-            
-            validated_response = {{ tool.response_model }}(**response_data)
-            return {"ok": True, "data": validated_response.model_dump()}
+            validated_response = {response_model}.model_validate_json(response.content)
+            return {{"ok": True, "data": validated_response.model_dump()}}
         except ValidationError as ve:
             # Validation failed - return structured error
-            return {
+            return {{
                 "ok": False,
-                "error": {
-                    "type": "VALIDATION_ERROR",
+                "error": {{
+                    "type": "JSON_PARSE_ERROR" if ve.errors()[0]["type"] == "json_invalid" else "VALIDATION_ERROR",
                     "details": str(ve),
-                    "response_data": response_data
-                }
-            }
-        except TypeError as te:
+                    "response_text": response.text[:500]
+                }}
+            }}
+"""
+
+# Inserted as-is (not a format string)
+_RESPONSE_DICT_BLOCK = """        try:
+            response_data = _json_loads(response.content)
+        except ValueError as json_error:
             return {
                 "ok": False,
                 "error": {
-                    "type": "MODEL_INSTANTIATION_ERROR",
-                    "details": str(te),
-                    "response_data": response_data
+                    "type": "JSON_PARSE_ERROR",
+                    "details": str(json_error),
+                    "response_text": response.text[:500]
                 }
             }
-        {% else %}
+        
         # No response model - validate that response is a dict
         if not isinstance(response_data, dict):
             return {
@@ -302,58 +241,370 @@ def {{ tool.name }}({% for arg, type in tool.args.items() %}{{ arg }}: {{ type }
                 }
             }
         return {"ok": True, "data": response_data}
-        {% endif %}
-    except Exception as e:
-        if hasattr(e, 'response') and e.response is not None:
-            return {
-                "ok": False,
-                "error": {
-                    "type": "HTTP_ERROR",
-                    "details": {
-                        "status_code": e.response.status_code,
-                        "body": e.response.text[:500]
-                    }
-                }
-            }
-        else:
-            return {
-                "ok": False,
-                "error": {
-                    "type": "EXCEPTION",
-                    "details": str(e),
-                    "url_attempted": base_url
-                }
-            }
+"""
 
-{% endfor %}
-# --------- MCP Prompts ---------
-{% for prompt in prompts %}
-@mcp.prompt()
-def {{ prompt.name }}_prompt():
-    \"\"\"{{ prompt.desc }}\"\"\"
-    return {
-        "name": "{{ prompt.name }}",
-        "arguments": [{% if prompt.args %}{{ prompt.args.split(',')|map('trim')|map('tojson')|join(', ') }}{% endif %}],
-        "description": "{{ prompt.desc }}",
-        "text": "{{ prompt.text }}"
-    }
+# Prompt blocks are plain substitutions and are filled with str.format
+_PROMPT_TEMPLATE = """@mcp.prompt()
+def {name}_prompt():
+    \"\"\"{desc}\"\"\"
+    return {{
+        "name": "{name}",
+        "arguments": [{arguments}],
+        "description": "{desc}",
+        "text": "{text}"
+    }}
+"""
 
-{% endfor %}
-if __name__ == "__main__":
+_SERVER_FOOTER = """if __name__ == "__main__":
     mcp.run()
 """
-    return Template(template_str).render(
-        api_name=api_name,
-        tools=tools,
-        prompts=prompts,
-        models=used_models,
-        aliases=model_aliases
+
+
+@functools.lru_cache(maxsize=None)
+def _get_template_env():
+    """
+    Build the Jinja2 environment holding the server header template once.
+    Streamlit reruns call the generator repeatedly with the same templates;
+    the bytecode cache also skips parsing on later process starts.
+    Jinja2 is imported here so Steps 1-2 never pay its import cost.
+    """
+    from jinja2 import DictLoader, Environment, FileSystemBytecodeCache
+
+    env = Environment(
+        loader=DictLoader({
+            "server_header": _SERVER_HEADER_TEMPLATE,
+        }),
+        bytecode_cache=FileSystemBytecodeCache(),
+        auto_reload=False,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
     )
+    return env
+
+
+@functools.lru_cache(maxsize=None)
+def _get_template(name):
+    """
+    Return the compiled template by name, resolved through the loader once.
+    Later renders skip the environment's loader and cache lookups entirely.
+    """
+    return _get_template_env().get_template(name)
+
+
+# Tool dict keys read by _render_tool (besides args), used as the render cache key
+_TOOL_TEMPLATE_FIELDS = (
+    "name", "url", "method", "auth", "auth_val", "auth_const", "desc",
+    "body_model", "response_model", "has_file_fields", "has_query_params",
+)
+
+
+def _auth_constants(env_vars):
+    """
+    Assign module-level constant names holding auth env var values in the
+    generated server, e.g. BEARERAUTH_TOKEN -> _AUTH_BEARERAUTH_TOKEN.
+    Case is kept; a variable whose sanitized name (or one of its header
+    constants) is already taken gets a numeric suffix, so distinct
+    variables such as API-KEY and API_KEY never share a constant.
+    
+    Args:
+        env_vars (iterable): Distinct env var names, in a stable order
+    
+    Returns:
+        dict: env var name -> constant name
+    """
+    constants = {}
+    taken = set()
+    for var in env_vars:
+        base = "_AUTH_" + re.sub(r"\W", "_", str(var))
+        const = base
+        counter = 2
+        while const in taken or any(const + suffix in taken for suffix in _AUTH_HEADER_SUFFIXES.values()):
+            const = f"{base}_{counter}"
+            counter += 1
+        taken.add(const)
+        taken.update(const + suffix for suffix in _AUTH_HEADER_SUFFIXES.values())
+        constants[var] = const
+    return constants
+
+
+@functools.lru_cache(maxsize=256)
+def _render_tool(tool_fields, args_items):
+    """
+    Render one tool function, memoized on the tool's frozen fields.
+    Adding a tool re-renders only that tool; unchanged tools hit the cache.
+    """
+    tool = dict(zip(_TOOL_TEMPLATE_FIELDS, tool_fields))
+    args = dict(args_items)
+    # Path params are resolved at generation time into straight-line substitutions
+    path_params = [param for param in dict.fromkeys(_PATH_PARAM_RE.findall(tool["url"])) if param in args]
+    # Args are partitioned at generation time: path params go into the URL,
+    # the rest are sent as query params when the endpoint declares any
+    query_args = ", ".join(
+        f'"{arg}": {arg}' for arg in args if arg not in path_params and arg != "body"
+    ) if tool["has_query_params"] else ""
+    request_kwargs = []
+    if tool["auth"] in _AUTH_HEADER_SUFFIXES:
+        headers_const = tool["auth_const"] + _AUTH_HEADER_SUFFIXES[tool["auth"]]
+        request_kwargs.append(_HEADERS_KWARG.format(headers_const=headers_const))
+    if query_args:
+        request_kwargs.append(_QUERY_PARAMS_KWARG.format(query_args=query_args))
+    if tool["body_model"] and "body" in args:
+        request_kwargs.append(_BODY_KWARG.format(payload_key="files" if tool["has_file_fields"] else "json"))
+    if tool["response_model"]:
+        response_handling = _RESPONSE_MODEL_BLOCK.format(response_model=tool["response_model"])
+    else:
+        response_handling = _RESPONSE_DICT_BLOCK
+    return _TOOL_TEMPLATE.format(
+        name=tool["name"],
+        signature=", ".join(f"{arg}: {arg_type}" for arg, arg_type in args_items),
+        desc=tool["desc"],
+        url=tool["url"],
+        path_substitutions="".join(
+            f'    base_url = base_url.replace("{{{param}}}", str({param}))\n' for param in path_params
+        ),
+        method=tool["method"],
+        request_kwargs="".join(request_kwargs),
+        response_handling=response_handling,
+    )
+
+
+def _render_prompt(prompt):
+    """
+    Render one MCP prompt function with plain string formatting.
+    Comma-separated prompt args become a list of JSON string literals;
+    blank entries (e.g. from a trailing comma) are dropped.
+    """
+    arguments = ", ".join(json.dumps(arg) for arg in (raw.strip() for raw in prompt["args"].split(",")) if arg)
+    return _PROMPT_TEMPLATE.format(
+        name=prompt["name"],
+        desc=prompt["desc"],
+        text=prompt["text"],
+        arguments=arguments,
+    )
+
+
+def _create_session_with_retries():
+    """
+    Create a requests Session with exponential backoff retry strategy.
+    Retries on connection errors and specified HTTP status codes, and keeps
+    a larger connection pool so concurrent tool calls reuse warm connections.
+    """
+    session = requests.Session()
+    from urllib3.util.retry import Retry
+    from requests.adapters import HTTPAdapter
+    
+    retry_strategy = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "POST", "PUT", "DELETE", "PATCH"]
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry_strategy)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _extract_path_params(base_url, args):
+    """
+    Extract path parameters from URL template and substitute them.
+    Returns tuple of (final_url, remaining_args).
+    Path params like {id} are replaced with values from args dict.
+    The args dict is not copied: path params are popped from it in place
+    and the same dict is returned as remaining_args.
+    """
+    for param in _PATH_PARAM_RE.findall(base_url):
+        if param in args:
+            base_url = base_url.replace("{" + param + "}", str(args.pop(param)))
+    return base_url, args
+
+
+def _get_model_aliases(tools, models):
+    """
+    Identify tools that share the same model and generate alias assignments.
+    Returns dict mapping alias_name to canonical model name.
+    Each alias is emitted once; aliases naming the model itself, shadowing
+    an emitted model, or pointing at a model that is not emitted are skipped.
+    
+    Example:
+        CreateUserRequest and UpdateUserRequest both reference User model
+        Returns aliases for both pointing to the canonical User class
+    """
+    model_usage = defaultdict(dict)  # model_name -> {(tool_name, usage): alias_name}
+    aliases = {}  # alias_name -> canonical_model
+    
+    # Count which models are used by which tools
+    for tool in tools:
+        body_model = tool.get("body_model")
+        response_model = tool.get("response_model")
+        if not body_model and not response_model:
+            continue
+        
+        tool_title = tool["name"].title().replace("_", "")
+        if body_model:
+            model_usage[body_model][(tool["name"], "Request")] = tool_title + "Request"
+        if response_model:
+            model_usage[response_model][(tool["name"], "Response")] = tool_title + "Response"
+    
+    # Generate aliases for models used by multiple tools
+    for model_name, usages in model_usage.items():
+        if len(usages) > 1 and model_name in models:
+            # Multiple tools use this model - create aliases
+            for alias_name in usages.values():
+                if alias_name != model_name and alias_name not in models:
+                    aliases.setdefault(alias_name, model_name)
+    
+    return aliases
+
+
+def _dedupe_models(tools, models):
+    """
+    Collapse structurally identical models into a single canonical model.
+    Returns tuple of (tools, used_models) where tools are shallow copies
+    whose model references point at the canonical model names.
+
+    Example:
+        MakeBlobRequest and ReplaceBlobRequest both have fields {data: dict}
+        Both tools are rewritten to reference MakeBlobRequest only
+    """
+    canonical_by_key = {}  # sorted fields -> canonical model name
+    renamed = {}  # model_name -> canonical model name
+    used_models = {}
+
+    for tool in tools:
+        for ref in ("body_model", "response_model"):
+            model_name = tool.get(ref)
+            if not model_name or model_name not in models or model_name in renamed:
+                continue
+            key = tuple(sorted(models[model_name].items()))
+            canonical = canonical_by_key.setdefault(key, model_name)
+            renamed[model_name] = canonical
+            if canonical == model_name:
+                used_models[model_name] = models[model_name]
+
+    deduped_tools = []
+    for tool in tools:
+        tool = dict(tool)
+        for ref in ("body_model", "response_model"):
+            if tool.get(ref) in renamed:
+                tool[ref] = renamed[tool[ref]]
+        body_type = tool.get("args", {}).get("body")
+        if body_type in renamed and body_type != renamed[body_type]:
+            tool["args"] = {**tool["args"], "body": renamed[body_type]}
+        deduped_tools.append(tool)
+
+    return deduped_tools, used_models
+
+
+def _to_dict(obj):
+    """
+    Convert Pydantic model or dict to plain dictionary.
+    Handles both Pydantic models (with .dict() method) and regular dicts.
+    """
+    if hasattr(obj, 'dict') and callable(obj.dict):
+        return obj.dict()
+    elif isinstance(obj, dict):
+        return obj
+    return obj
+
+
+def _build_template_context(api_name, tools, prompts, models, use_httpx=False):
+    """
+    Build the render context for the REST server template.
+    Only models referenced by the given tools are included.
+    Tools, prompts, models and aliases are sorted by name so that the same
+    API always produces byte-identical source, whatever the input order.
+    """
+    tools = sorted(tools, key=lambda tool: tool["name"])
+    prompts = sorted(prompts, key=lambda prompt: prompt["name"])
+
+    # Include request/response models, collapsing structural duplicates
+    tools, used_models = _dedupe_models(tools, models)
+
+    # Get model aliases for deduplication
+    model_aliases = _get_model_aliases(tools, used_models)
+
+    # Auth env vars are read once at import, one constant per variable,
+    # plus one header dict per (auth type, variable) pair
+    auth_consts = _auth_constants(sorted({
+        str(tool["auth_val"]) for tool in tools if tool.get("auth") in _AUTH_HEADER_SUFFIXES
+    }))
+    auth_vars = {}
+    auth_headers = {}
+    for tool in tools:
+        auth = tool.get("auth")
+        if auth not in _AUTH_HEADER_SUFFIXES:
+            continue
+        # tools are the shallow copies made by _dedupe_models, safe to annotate
+        const = tool["auth_const"] = auth_consts[str(tool["auth_val"])]
+        auth_vars.setdefault(const, (const, tool["auth_val"], _AUTH_DEFAULTS[auth]))
+        headers_const = const + _AUTH_HEADER_SUFFIXES[auth]
+        auth_headers.setdefault(headers_const, (headers_const, _AUTH_HEADER_LITERALS[auth].format(auth_const=const)))
+
+    return {
+        "api_name": api_name,
+        "tools": tools,
+        "prompts": prompts,
+        "models": dict(sorted(used_models.items())),
+        "aliases": dict(sorted(model_aliases.items())),
+        "auth_vars": sorted(auth_vars.values()),
+        "auth_headers": sorted(auth_headers.values()),
+        "use_httpx": use_httpx,
+    }
+
+
+def write_rest_mcp_code(fileobj, api_name, tools, prompts, models, use_httpx=False):
+    """
+    Stream FastMCP server code for REST APIs into a file-like object.
+    
+    Sections are written as they are rendered, so the full source is never
+    held in memory as one string.
+    
+    Args:
+        fileobj: Writable text file-like object
+        api_name (str): Name of the MCP server
+        tools (list): List of REST tool definitions
+        prompts (list): List of prompt templates
+        models (dict): Dictionary of Pydantic model definitions
+        use_httpx (bool): Emit an HTTP/2 httpx client instead of a requests session
+    """
+    context = _build_template_context(api_name, tools, prompts, models, use_httpx)
+    _get_template("server_header").stream(**context).dump(fileobj)
+    for tool in context["tools"]:
+        fileobj.write("\n")
+        fileobj.write(_render_tool(tuple(tool.get(field) for field in _TOOL_TEMPLATE_FIELDS), tuple(tool["args"].items())))
+    fileobj.write("\n# --------- MCP Prompts ---------\n")
+    for index, prompt in enumerate(context["prompts"]):
+        if index:
+            fileobj.write("\n")
+        fileobj.write(_render_prompt(prompt))
+    fileobj.write("\n")
+    fileobj.write(_SERVER_FOOTER)
+
+
+def generate_rest_mcp_code(api_name, tools, prompts, models, use_httpx=False):
+    """
+    Generate FastMCP server code for REST APIs only.
+    
+    Args:
+        api_name (str): Name of the MCP server
+        tools (list): List of REST tool definitions
+        prompts (list): List of prompt templates
+        models (dict): Dictionary of Pydantic model definitions
+        use_httpx (bool): Emit an HTTP/2 httpx client instead of a requests session
+    
+    Returns:
+        str: Complete Python source code for FastMCP REST server
+    """
+    buffer = io.StringIO()
+    write_rest_mcp_code(buffer, api_name, tools, prompts, models, use_httpx)
+    return buffer.getvalue()
 
 
 
 
-def generate_mcp_code(api_name, tools, prompts, models):
+def generate_mcp_code(api_name, tools, prompts, models, use_httpx=False):
     """
     Generate FastMCP server code for REST APIs only.
     
@@ -362,6 +613,7 @@ def generate_mcp_code(api_name, tools, prompts, models):
         tools (list): List of REST tool definitions
         prompts (list): List of prompt templates
         models (dict): Dictionary of Pydantic model definitions
+        use_httpx (bool): Emit an HTTP/2 httpx client instead of a requests session
     
     Returns:
         str: Complete Python source code for FastMCP REST server
@@ -369,4 +621,4 @@ def generate_mcp_code(api_name, tools, prompts, models):
     if not tools:
         return ""
     
-    return generate_rest_mcp_code(api_name, tools, prompts, models)
+    return generate_rest_mcp_code(api_name, tools, prompts, models, use_httpx)
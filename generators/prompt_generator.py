@@ -3,42 +3,43 @@ Prompt generation module for MCP servers.
 Generates MCP-compliant prompt templates using LLM APIs.
 """
 
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 
+# Specs with more tools than this are split into chunks requested concurrently
+_CHUNK_THRESHOLD = 20
+_CHUNK_SIZE = 15
 
-def auto_generate_prompts(tools, api_key=None, provider="openai"):
+# Reply budget: a base for the JSON wrapper plus room for one prompt object per tool,
+# capped below the smallest completion limit of the supported models
+_BASE_MAX_TOKENS = 300
+_MAX_TOKENS_PER_TOOL = 250
+_MAX_TOKENS_CAP = 8000
+
+# Doubled braces the model copies from the prompt examples, collapsed in one pass
+_BRACE_RE = re.compile(r"\{\{|\}\}")
+_BRACE_MAP = {"{{": "{", "}}": "}"}
+
+
+def _request_prompts(client, model, tools):
     """
-    Generate MCP-compliant prompt templates for API tools using LLM.
-    One prompt per tool with specific arguments matching the tool's parameters.
-    Supports both OpenAI and Groq providers.
+    Ask the LLM for one prompt template per tool, answered as a JSON object.
     
     Args:
-        tools (list): List of tool definitions with name, args, desc, etc.
-        api_key (str): API key for the LLM provider
-        provider (str): "openai" or "groq"
+        client: OpenAI-compatible client (OpenAI or Groq)
+        model (str): Model name for the provider
+        tools (list): Tool definitions covered by this request
     
     Returns:
-        list: List of prompt templates with name, args, text, desc fields
+        list: Prompt entries as returned by the model (unvalidated); empty when
+              the reply was truncated or is not a JSON object
     """
-    if provider == "groq":
-        from groq import Groq
-        client = Groq(api_key=api_key)
-        model = "llama-3.1-8b-instant"
-    else:
-        if api_key:
-            client = OpenAI(api_key=api_key)
-        else:
-            client = OpenAI()
-        model = "gpt-4o"
-
-    tool_descriptions = []
-    for t in tools:
-        args = ", ".join(t["args"].keys()) if t["args"] else "none"
-        tool_descriptions.append(
-            f"Tool: {t['name']}\nDescription: {t['desc']}\nMethod: {t['method']}\nURL: {t['url']}\nArguments: {args}"
-        )
-
-    joined = "\n\n---\n\n".join(tool_descriptions)
+    joined = "\n\n---\n\n".join(
+        f"Tool: {t['name']}\nDescription: {t['desc']}\nMethod: {t['method']}\nURL: {t['url']}\nArguments: {', '.join(t['args']) or 'none'}"
+        for t in tools
+    )
 
     user_msg = f"""
 You are an expert at creating MCP (Model Context Protocol) prompt templates for API tools.
@@ -55,120 +56,100 @@ Format requirement:
 2. Prompt Arguments: Extract relevant arguments from the tool's parameter list (comma-separated, or empty if "none")
 3. Prompt Text: Write a clear instruction. ONLY use {{{{placeholder}}}} if that argument exists in the tool!
 
-MCP Prompt Format:
-- Name: [ToolName] - MUST EXACTLY match the tool name
-- Arguments: [Extracted from tool args, or leave EMPTY if tool has no arguments]
-- Description: [One-line description]
-- Text: [Template with NO placeholders if tool has no arguments]
-
 EXAMPLES:
 
 Example 1 - Tool WITH arguments "GetUser" (id, limit):
-- Name: GetUser
-- Arguments: id, limit
-- Description: Fetch user details
-- Text: "Query user with ID {{{{id}}}} and retrieve {{{{limit}}}} records"
+{{"tool": "GetUser", "name": "GetUser", "args": "id, limit", "desc": "Fetch user details", "text": "Query user with ID {{{{id}}}} and retrieve {{{{limit}}}} records"}}
 
 Example 2 - Tool with NO arguments "ListAllContinents" ():
-- Name: ListAllContinents
-- Arguments: (EMPTY)
-- Description: List all continents
-- Text: "Retrieve the complete list of continents"
+{{"tool": "ListAllContinents", "name": "ListAllContinents", "args": "", "desc": "List all continents", "text": "Retrieve the complete list of continents"}}
 
 Tools:
 {joined}
 
-Generate exactly one complete MCP prompt template per tool. Format each as:
----
-Tool: [tool_name]
-Name: [tool_name] (MUST BE IDENTICAL)
-Arguments: [arg1, arg2, ...] or EMPTY if no arguments
-Description: [description]
-Text: [template text with placeholders ONLY for arguments that exist]
----
+Respond with a single JSON object of the form {{"prompts": [...]}} holding exactly one
+prompt object per tool, with the fields "tool", "name" (MUST BE IDENTICAL to "tool"),
+"args" (comma-separated string, or "" if no arguments), "desc" and "text"
+(placeholders ONLY for arguments that exist).
     """
 
     response = client.chat.completions.create(
         model=model,
         messages=[
-            {"role": "system", "content": "You are a helpful assistant that generates MCP-compliant prompts for API tools. IMPORTANT: Only use {{{{placeholders}}}} for arguments that actually exist in the tool."},
+            {"role": "system", "content": "You are a helpful assistant that generates MCP-compliant prompts for API tools and answers in JSON. IMPORTANT: Only use {{{{placeholders}}}} for arguments that actually exist in the tool."},
             {"role": "user", "content": user_msg}
         ],
+        response_format={"type": "json_object"},
         temperature=0.7,
-        max_tokens=1200
+        max_tokens=min(_BASE_MAX_TOKENS + _MAX_TOKENS_PER_TOOL * len(tools), _MAX_TOKENS_CAP)
     )
 
-    text = response.choices[0].message.content.strip()
+    # A reply cut off at max_tokens is still "JSON mode" but not valid JSON;
+    # either way this chunk yields nothing rather than failing the other chunks
+    choice = response.choices[0]
+    if choice.finish_reason == "length":
+        return []
+    try:
+        reply = json.loads(choice.message.content or "")
+    except ValueError:
+        return []
+    if not isinstance(reply, dict):
+        return []
+    prompts = reply.get("prompts", [])
+    return prompts if isinstance(prompts, list) else []
 
-    all_prompts = []
-    current_tool = None
-    current_prompt = {
-        "name": "",
-        "args": "",
-        "text": "",
-        "desc": ""
-    }
+
+def auto_generate_prompts(tools, api_key=None, provider="openai"):
+    """
+    Generate MCP-compliant prompt templates for API tools using LLM.
+    One prompt per tool with specific arguments matching the tool's parameters.
+    Supports both OpenAI and Groq providers.
     
-    lines = text.split("\n")
+    Args:
+        tools (list): List of tool definitions with name, args, desc, etc.
+        api_key (str): API key for the LLM provider
+        provider (str): "openai" or "groq"
     
-    for line in lines:
-        line = line.strip()
-        
-        # Skip empty lines and separators
-        if not line or line == "---":
-            # If we have a complete prompt, save it
-            if current_prompt["name"] and current_prompt["text"]:
+    Returns:
+        list: List of prompt templates with name, args, text, desc fields
+    """
+    if provider == "groq":
+        from groq import Groq
+        client = Groq(api_key=api_key)
+        model = "llama-3.1-8b-instant"
+    else:
+        if api_key:
+            client = OpenAI(api_key=api_key)
+        else:
+            client = OpenAI()
+        model = "gpt-4o"
+
+    if len(tools) > _CHUNK_THRESHOLD:
+        chunks = [tools[i:i + _CHUNK_SIZE] for i in range(0, len(tools), _CHUNK_SIZE)]
+        with ThreadPoolExecutor(max_workers=min(len(chunks), 8)) as executor:
+            results = list(executor.map(lambda chunk: _request_prompts(client, model, chunk), chunks))
+    else:
+        results = [_request_prompts(client, model, tools)]
+
+    all_prompts = []
+    for raw_prompts in results:
+        for raw in raw_prompts:
+            # JSON mode guarantees valid JSON, not the requested shape
+            if not isinstance(raw, dict) or not raw.get("name") or not raw.get("text") or not isinstance(raw["text"], str):
+                continue
+            args = raw.get("args") or ""
+            if isinstance(args, list):
+                args = ", ".join(map(str, args))
+            # Clean up prompt text: replace {{ with { and }} with }
+            cleaned_text = _BRACE_RE.sub(lambda m: _BRACE_MAP[m.group()], raw["text"])
+            # Remove surrounding quotes if present
+            cleaned_text = cleaned_text.strip('"\'')
+            all_prompts.append({
                 # Force prompt name to match tool name for MCP auto-linking
-                if current_tool:
-                    current_prompt["name"] = current_tool
-                # Clean up prompt text: replace {{ with { and }} with }
-                cleaned_text = current_prompt["text"].replace("{{", "{").replace("}}", "}")
-                # Remove surrounding quotes if present
-                cleaned_text = cleaned_text.strip('"\'')
-                all_prompts.append({
-                    "name": current_prompt["name"],
-                    "args": current_prompt["args"],
-                    "text": cleaned_text,
-                    "desc": current_prompt["desc"]
-                })
-                current_prompt = {
-                    "name": "",
-                    "args": "",
-                    "text": "",
-                    "desc": ""
-                }
-            continue
-        
-        # Parse MCP format lines
-        if line.lower().startswith("tool:"):
-            current_tool = line.replace("Tool:", "").replace("tool:", "").strip()
-        elif line.lower().startswith("name:"):
-            current_prompt["name"] = line.replace("Name:", "").replace("name:", "").strip()
-        elif line.lower().startswith("arguments:"):
-            current_prompt["args"] = line.replace("Arguments:", "").replace("arguments:", "").strip()
-        elif line.lower().startswith("description:"):
-            current_prompt["desc"] = line.replace("Description:", "").replace("description:", "").strip()
-        elif line.lower().startswith("text:"):
-            # Capture text after "Text:" and continue on next lines
-            current_prompt["text"] = line.replace("Text:", "").replace("text:", "").strip()
-        elif current_prompt["name"] and line and not line.lower().startswith(("tool:", "name:", "arguments:", "description:")):
-            # Continue capturing multi-line text
-            if current_prompt["text"]:
-                current_prompt["text"] += " " + line
-            else:
-                current_prompt["text"] = line
-    
-    # Don't forget the last prompt
-    if current_prompt["name"] and current_prompt["text"]:
-        # Clean up prompt text: replace {{ with { and }} with }
-        cleaned_text = current_prompt["text"].replace("{{", "{").replace("}}", "}")
-        # Remove surrounding quotes if present
-        cleaned_text = cleaned_text.strip('"\'')
-        all_prompts.append({
-            "name": current_prompt["name"],
-            "args": current_prompt["args"],
-            "text": cleaned_text,
-            "desc": current_prompt["desc"]
-        })
-    
+                "name": str(raw.get("tool") or raw["name"]),
+                "args": str(args),
+                "text": cleaned_text,
+                "desc": str(raw.get("desc") or "")
+            })
+
     return all_prompts
@@ -5,6 +5,7 @@ Exports API parsing functions for OpenAPI and Swagger.
 
 from .openapi_parser import (
     swagger_to_tools,
+    swagger_to_tools_iter,
     _normalize_type,
     _map_schema_to_type,
     _extract_schema_fields,
@@ -14,6 +15,7 @@ from .openapi_parser import (
 
 __all__ = [
     "swagger_to_tools",
+    "swagger_to_tools_iter",
     "_normalize_type",
     "_map_schema_to_type",
     "_extract_schema_fields",
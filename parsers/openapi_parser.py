@@ -4,9 +4,125 @@ Extracts endpoints, parameters, authentication, and generates Pydantic models.
 """
 
 import json
+import re
 import yaml
-from collections import OrderedDict
-import hashlib
+from functools import lru_cache
+
+# libyaml's C loader when PyYAML was built with it; same safe semantics, much faster
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# orjson when installed; its decode errors subclass ValueError like the stdlib ones
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# ijson when installed; large JSON specs laid out for it then stream their paths
+# instead of materializing the whole document at once (less memory, more time)
+try:
+    import ijson
+    from ijson.common import ObjectBuilder as _ObjectBuilder
+except ImportError:
+    ijson = None
+
+# JSON specs longer than this (in characters) are stream-parsed when ijson is available
+_STREAM_THRESHOLD = 5_000_000
+
+# Top-level sections read while building tools; a spec is only streamed when all
+# of them precede 'paths' in the document (keyed by is_openapi)
+_STREAM_REQUIRED_KEYS = {
+    True: ("servers", "components"),
+    False: ("host", "schemes", "basePath", "definitions", "securityDefinitions"),
+}
+
+# ijson events that open and close a JSON container
+_JSON_OPEN_EVENTS = frozenset(("start_map", "start_array"))
+_JSON_CLOSE_EVENTS = frozenset(("end_map", "end_array"))
+
+# Only text starting like a JSON object/array is tried as JSON before YAML
+_JSON_START_RE = re.compile(r"\s*[{\[]")
+
+# Fallback tool names: "/users/{id}" -> "users_id" in one translate pass
+_PATH_TRANS = str.maketrans({"/": "_", "{": "", "}": ""})
+
+# HTTP methods that are turned into tools, keyed in both cases -> upper-case name;
+# other path-item keys are skipped
+_HTTP_METHODS = {
+    **{m: m.upper() for m in ("get", "post", "put", "delete", "patch")},
+    **{m: m for m in ("GET", "POST", "PUT", "DELETE", "PATCH")},
+}
+
+# Validation messages shown to the user (Markdown) when required spec fields are missing
+_ERR_MISSING_SERVERS = (
+    "❌ **OpenAPI spec missing 'servers' field**\n\n"
+    "OpenAPI 3.0 requires at least one server. Example:\n"
+    "```json\n"
+    '"servers": [{"url": "https://api.example.com/v1"}]\n'
+    "```\n\n"
+    "See: https://swagger.io/specification/#servers-object"
+)
+_ERR_EMPTY_SERVER_URL = (
+    "❌ **First server object has empty 'url'**\n\n"
+    "Provide a valid server URL. Example:\n"
+    "```json\n"
+    '"servers": [{"url": "https://api.example.com/v1"}]\n'
+    "```"
+)
+_ERR_MISSING_HOST = (
+    "❌ **Swagger spec missing required 'host' field**\n\n"
+    "Add the 'host' field to your Swagger spec. Example:\n"
+    "```json\n"
+    '"host": "api.example.com",\n'
+    '"schemes": ["https"],\n'
+    '"basePath": "/v2.0"\n'
+    "```\n\n"
+    "See: https://swagger.io/specification/v2/#fixed-fields"
+)
+_ERR_MISSING_SCHEMES = (
+    "❌ **Swagger spec missing 'schemes' field**\n\n"
+    "Specify the protocol scheme. Example:\n"
+    "```json\n"
+    '"schemes": ["https"]\n'
+    "```"
+)
+_ERR_MISSING_BASE_PATH = (
+    "❌ **Swagger spec missing 'basePath' field**\n\n"
+    "Add the base path for your API. Example:\n"
+    "```json\n"
+    '"basePath": "/v2.0"\n'
+    "```\n\n"
+    "If your API has no version path, use: `\"basePath\": \"/\"`"
+)
+
+# Parameter locations that become plain tool arguments (body/formData feed the body model)
+_SIMPLE_PARAM_LOCATIONS = frozenset(("path", "query", "header"))
+
+# Success status codes tried in order before any other 2xx response
+_PREFERRED_STATUS = ("200", "201", "202", "204")
+
+# Base name of the single {"data": dict} model shared by bodies/responses without properties
+_GENERIC_MODEL = "GenericModel"
+
+# OpenAPI/Swagger primitive type names -> Python type annotations
+_TYPE_MAP = {
+    "string": "str",
+    "integer": "int",
+    "number": "float",
+    "boolean": "bool",
+    "file": "str",
+    "array": "list",
+    "object": "dict",
+}
+
+# _TYPE_MAP minus "array", whose item type needs the rest of the schema
+_PRIMITIVE_TYPE_MAP = {k: v for k, v in _TYPE_MAP.items() if k != "array"}
+
+# One shared string per common array type instead of a fresh f-string per array schema
+_LIST_TYPES = {t: f"list[{t}]" for t in ("str", "int", "float", "bool", "dict", "list")}
 
 
 def _normalize_type(type_str):
@@ -14,113 +130,151 @@ def _normalize_type(type_str):
     Convert OpenAPI/Swagger type strings to valid Python type annotations.
     Maps raw type names like 'string', 'integer', 'file' to Python equivalents.
     """
-    if not type_str:
-        return "str"
-    
-    type_map = {
-        "string": "str",
-        "integer": "int",
-        "number": "float",
-        "boolean": "bool",
-        "file": "str",
-        "array": "list",
-        "object": "dict",
-    }
-    
-    return type_map.get(type_str, type_str)
+    return _TYPE_MAP.get(type_str, type_str) if type_str else "str"
 
 
 def _normalize_schema_for_comparison(fields):
     """
     Normalize schema fields to a canonical form for comparison.
-    Returns a hash of the sorted field definitions.
+    Returns a hashable tuple of the sorted field definitions.
     This allows identifying identical schemas regardless of naming.
     """
-    if not fields:
-        return None
-    
-    # Create a sorted representation of fields
-    sorted_items = sorted(fields.items())
-    canonical = json.dumps(sorted_items, sort_keys=True)
-    return hashlib.md5(canonical.encode()).hexdigest()
+    return tuple(sorted(fields.items())) if fields else None
+
+
+@lru_cache(maxsize=4096)
+def _ref_parts(ref_path):
+    """
+    Split a local $ref path into its keys, e.g. "#/definitions/User" -> ("definitions", "User").
+    Cached across parses since large specs repeat the same few hundred refs.
+    """
+    return tuple(ref_path.lstrip("#/").split("/"))
 
 
-def _resolve_schema_ref(ref_path, spec, is_openapi):
+def _resolve_schema_ref(ref_path, spec, is_openapi, ref_cache=None):
     """
     Resolve $ref reference paths to actual schema definitions.
     OpenAPI 3.0: #/components/schemas/ModelName
     Swagger 2.0: #/definitions/ModelName
+    When a ref_cache dict is given, each ref path is walked only once per parse.
     """
-    if not ref_path.startswith("#/"):
-        return None
+    if ref_cache is not None and ref_path in ref_cache:
+        return ref_cache[ref_path]
     
-    parts = ref_path.lstrip("#/").split("/")
-    current = spec
-    
-    for part in parts:
-        if isinstance(current, dict):
+    resolved = None
+    if ref_path.startswith("#/"):
+        current = spec
+        for part in _ref_parts(ref_path):
+            if not isinstance(current, dict):
+                current = None
+                break
             current = current.get(part)
-        else:
-            return None
+        resolved = current if isinstance(current, dict) else None
     
-    return current if isinstance(current, dict) else None
+    if ref_cache is not None:
+        ref_cache[ref_path] = resolved
+    return resolved
 
 
-def _map_schema_to_type(schema, spec, is_openapi):
+def _map_schema_to_type(schema, spec, is_openapi, ref_cache=None, type_cache=None):
     """
     Map OpenAPI/Swagger schema to Python type annotation string.
     Handles basic types, refs, arrays, and nested objects.
+    When a type_cache dict is given, results are memoized by id(schema) across
+    calls; ids are only valid while the schema is alive, so callers must not keep
+    entries past the lifetime of the schemas they were computed for.
+    A schema that refers back to itself (e.g. an array of its own $ref)
+    maps to "dict" at the point of recursion, with or without a type_cache.
     """
     if not schema:
         return "str"
+    # Primitives and objects are cheaper to map than to look up in the cache
+    if "$ref" not in schema:
+        primitive = _PRIMITIVE_TYPE_MAP.get(schema.get("type"))
+        if primitive is not None:
+            return primitive
+    if type_cache is None:
+        # Callers without a cache still get the cycle guard; this one lives for the call
+        type_cache = {}
     
-    # Handle $ref references - resolve and get type of resolved schema
+    key = id(schema)
+    if key not in type_cache:
+        # Seeded before recursing so a cycle back to this schema ends here
+        type_cache[key] = "dict"
+        type_cache[key] = _compute_schema_type(schema, spec, is_openapi, ref_cache, type_cache)
+    return type_cache[key]
+
+
+def _compute_schema_type(schema, spec, is_openapi, ref_cache, type_cache):
+    """
+    Uncached body of _map_schema_to_type for a non-empty schema.
+    Nested schemas go back through _map_schema_to_type so they are memoized too.
+    """
+    # Handle $ref references - follow the chain, then get type of the target schema
     if "$ref" in schema:
-        ref_path = schema["$ref"]
-        resolved_schema = _resolve_schema_ref(ref_path, spec, is_openapi)
-        if resolved_schema:
-            return _map_schema_to_type(resolved_schema, spec, is_openapi)
-        
-        # Extract model name from ref path
-        parts = ref_path.split("/")
-        if parts[-1]:
-            return parts[-1]
-        return "dict"
+        visiting = set()
+        while "$ref" in schema:
+            ref_path = schema["$ref"]
+            if ref_path in visiting:
+                # Refs that only point at each other never reach a real schema
+                return "dict"
+            visiting.add(ref_path)
+            resolved_schema = _resolve_schema_ref(ref_path, spec, is_openapi, ref_cache)
+            if not resolved_schema:
+                # Extract model name from ref path
+                parts = ref_path.split("/")
+                if parts[-1]:
+                    return _normalize_type(parts[-1])
+                return "dict"
+            schema = resolved_schema
+        return _map_schema_to_type(schema, spec, is_openapi, ref_cache, type_cache)
     
     schema_type = schema.get("type", "str")
-    schema_format = schema.get("format", "")
     
     if schema_type == "array":
-        item_type = _map_schema_to_type(schema.get("items", {}), spec, is_openapi)
-        return f"list[{item_type}]"
-    elif schema_type == "object":
-        # For objects with properties, they'll be handled as separate models
-        # For now, return dict as placeholder
-        return "dict"
-    elif schema_type in ["string", "integer", "number", "boolean", "file"]:
-        # Use the normalizer for all known types
-        return _normalize_type(schema_type)
-    else:
-        # Default fallback for any unrecognized type
-        return _normalize_type(schema_type)
+        item_type = _map_schema_to_type(schema.get("items", {}), spec, is_openapi, ref_cache, type_cache)
+        return _LIST_TYPES.get(item_type) or f"list[{item_type}]"
+    # Everything else is a single table lookup: primitives map to Python names,
+    # objects to a dict placeholder (models are built separately), unknown types pass through
+    return _normalize_type(schema_type)
 
 
-def _extract_schema_fields(schema, spec, is_openapi):
+def _extract_schema_fields(schema, spec, is_openapi, ref_cache=None, type_cache=None, fields_cache=None):
     """
     Recursively extract fields from schema properties.
     Returns dict of {field_name: python_type_string}
     Handles $ref references by resolving them first.
+    When a fields_cache dict is given, results are memoized by id(schema)
+    (same lifetime rule as type_cache in _map_schema_to_type)
+    and the cached dict is returned as-is, so callers must not mutate it.
     """
     if not schema:
         return {}
+    if fields_cache is None:
+        return _compute_schema_fields(schema, spec, is_openapi, ref_cache, type_cache, fields_cache)
     
-    # Handle $ref at schema level - resolve and extract from resolved schema
+    key = id(schema)
+    if key not in fields_cache:
+        fields_cache[key] = _compute_schema_fields(schema, spec, is_openapi, ref_cache, type_cache, fields_cache)
+    return fields_cache[key]
+
+
+def _compute_schema_fields(schema, spec, is_openapi, ref_cache, type_cache, fields_cache):
+    """
+    Uncached body of _extract_schema_fields for a non-empty schema.
+    """
+    # Handle $ref at schema level - follow the chain, then extract from the target schema
     if "$ref" in schema:
-        ref_path = schema["$ref"]
-        resolved_schema = _resolve_schema_ref(ref_path, spec, is_openapi)
-        if resolved_schema:
-            return _extract_schema_fields(resolved_schema, spec, is_openapi)
-        return {}
+        visiting = set()
+        while "$ref" in schema:
+            ref_path = schema["$ref"]
+            if ref_path in visiting:
+                return {}
+            visiting.add(ref_path)
+            schema = _resolve_schema_ref(ref_path, spec, is_openapi, ref_cache)
+            if not schema:
+                return {}
+        return _extract_schema_fields(schema, spec, is_openapi, ref_cache, type_cache, fields_cache)
     
     fields = {}
     properties = schema.get("properties", {})
@@ -131,14 +285,36 @@ def _extract_schema_fields(schema, spec, is_openapi):
         return {}
     
     for prop_name, prop_schema in properties.items():
-        field_type = _map_schema_to_type(prop_schema, spec, is_openapi)
-        # Normalize the type before storing
-        normalized_type = _normalize_type(field_type) if isinstance(field_type, str) and field_type in ["string", "integer", "number", "boolean", "file", "array", "object"] else field_type
-        fields[prop_name] = normalized_type
+        # _map_schema_to_type already returns normalized Python type names
+        fields[prop_name] = _map_schema_to_type(prop_schema, spec, is_openapi, ref_cache, type_cache)
     
     return fields
 
 
+def _response_obj_schema(response_obj, is_openapi):
+    """
+    Return the schema of a single response object.
+    
+    Args:
+        response_obj (dict): One entry of a responses object
+        is_openapi (bool): True for OpenAPI 3.0, False for Swagger 2.0
+    
+    Returns:
+        dict: Response schema, or None for an OpenAPI response without content
+    """
+    if is_openapi:
+        # OpenAPI 3.0: responses[status].content.application/json.schema
+        content = response_obj.get('content', {})
+        if 'application/json' in content:
+            return content['application/json'].get('schema', {})
+        # Fallback to any content type
+        for content_obj in content.values():
+            return content_obj.get('schema', {})
+        return None
+    # Swagger 2.0: responses[status].schema
+    return response_obj.get('schema', {})
+
+
 def _extract_response_schema(responses, spec, is_openapi):
     """
     Extract response schema from OpenAPI/Swagger responses object.
@@ -155,26 +331,162 @@ def _extract_response_schema(responses, spec, is_openapi):
     if not responses:
         return {}
     
-    # Try 200 response first, then 201, then any 2xx
-    for status_code in ['200', '201', '202', '204']:
+    # Try 200 response first, then 201, 202, 204
+    for status_code in _PREFERRED_STATUS:
         if status_code in responses:
-            response_obj = responses[status_code]
-            if is_openapi:
-                # OpenAPI 3.0: responses[status].content.application/json.schema
-                content = response_obj.get('content', {})
-                if 'application/json' in content:
-                    return content['application/json'].get('schema', {})
-                # Fallback to any content type
-                for content_type, content_obj in content.items():
-                    return content_obj.get('schema', {})
-            else:
-                # Swagger 2.0: responses[status].schema
-                return response_obj.get('schema', {})
+            schema = _response_obj_schema(responses[status_code], is_openapi)
+            if schema is not None:
+                return schema
+
+    # Then any other 2xx ("203", "2XX", or int keys from unquoted YAML)
+    for status_code, response_obj in responses.items():
+        if status_code not in _PREFERRED_STATUS and str(status_code).startswith('2'):
+            schema = _response_obj_schema(response_obj, is_openapi)
+            if schema is not None:
+                return schema
     
     # If no 2xx found, return empty dict
     return {}
 
 
+def _register_model(fields, resource_name, models, model_hash_map, name_counters):
+    """
+    Register a request/response model, reusing an existing one with identical fields.
+    
+    Args:
+        fields (dict): Non-empty {field_name: type} mapping, already normalized
+            by _extract_schema_fields / _normalize_type
+        resource_name (str): Base model name derived from the tool (e.g. "get_user" -> "User")
+        models (dict): Models registered so far; updated in place
+        model_hash_map (dict): Sorted fields tuple -> canonical model name; updated in place
+        name_counters (dict): Next numeric suffix to try per resource name; updated in place
+    
+    Returns:
+        str: Name of the new or reused model
+    """
+    # Check if this schema already exists (deduplication)
+    schema_key = _normalize_schema_for_comparison(fields)
+    if schema_key in model_hash_map:
+        return model_hash_map[schema_key]
+    
+    # Create new canonical model with resource-based name
+    model_name = resource_name
+    
+    # Ensure unique name if collision. Models are never removed during a parse,
+    # so suffixes below the saved counter are known to be taken
+    if model_name in models:
+        counter = name_counters.get(resource_name, 1)
+        model_name = f"{resource_name}{counter}"
+        while model_name in models:
+            counter += 1
+            model_name = f"{resource_name}{counter}"
+        name_counters[resource_name] = counter + 1
+    
+    models[model_name] = fields
+    model_hash_map[schema_key] = model_name
+    return model_name
+
+
+def _build_json_value(events, event, value):
+    """
+    Build one complete JSON value from an ijson event stream.
+    
+    Args:
+        events: Iterator of (prefix, event, value) triples from ijson.parse
+        event (str): First event of the value, already taken from events
+        value: Payload of that first event
+    
+    Returns:
+        The value as Python objects; only this value's events are consumed
+    """
+    builder = _ObjectBuilder()
+    depth = 0
+    while True:
+        builder.event(event, value)
+        if event in _JSON_OPEN_EVENTS:
+            depth += 1
+        elif event in _JSON_CLOSE_EVENTS:
+            depth -= 1
+        if depth == 0:
+            return builder.value
+        _, event, value = next(events)
+
+
+def _continue_top_level(events, spec):
+    """
+    Build the remaining top-level sections of a streamed spec into spec.
+    
+    Args:
+        events: Iterator of ijson events positioned between top-level entries
+        spec (dict): Spec being built; updated in place
+    """
+    for prefix, event, value in events:
+        if not prefix and event == "map_key":
+            _, first_event, first_value = next(events)
+            spec[value] = _build_json_value(events, first_event, first_value)
+
+
+def _stream_path_items(events, spec):
+    """
+    Yield (path, path_item) pairs of a streamed 'paths' object, then build the
+    top-level sections that follow it into spec.
+    
+    Args:
+        events: Iterator of ijson events positioned at the 'paths' value
+        spec (dict): Spec being built; updated in place
+    
+    Yields:
+        tuple: (path, path_item) as each path item is parsed
+    """
+    _, event, value = next(events)
+    if event == "start_map":
+        for _, event, value in events:
+            if event == "end_map":
+                break
+            # event is the map_key naming the next path item
+            _, first_event, first_value = next(events)
+            yield value, _build_json_value(events, first_event, first_value)
+    else:
+        # Not an object: no path items, but its events still have to be consumed
+        _build_json_value(events, event, value)
+    _continue_top_level(events, spec)
+
+
+def _load_streamed_spec(swagger_text):
+    """
+    Load a large JSON spec in a single ijson pass over its UTF-8 bytes, trading
+    speed for memory: every top-level section other than 'paths' is built in
+    full so $refs resolve, and path items are yielded lazily and dropped once
+    processed. That only works when every section the parser reads comes
+    before 'paths' in the document; otherwise streaming would have to hold
+    all path items anyway, so None is returned and the caller loads in memory.
+    
+    Args:
+        swagger_text (str): JSON specification text
+    
+    Returns:
+        tuple: (spec_dict, path_items) where spec_dict lacks 'paths' and
+               path_items lazily iterates (path, path_item) pairs,
+               or None when the spec cannot be streamed
+    """
+    events = ijson.parse(swagger_text.encode(), use_float=True)
+    spec = {}
+    for prefix, event, value in events:
+        if not prefix and event == "map_key":
+            if value == "paths":
+                break
+            _, first_event, first_value = next(events)
+            spec[value] = _build_json_value(events, first_event, first_value)
+    else:
+        # No paths at all; the whole document has been consumed
+        return spec, iter(())
+
+    is_openapi = "openapi" in spec
+    if ("openapi" in spec or "swagger" in spec) and all(key in spec for key in _STREAM_REQUIRED_KEYS[is_openapi]):
+        return spec, _stream_path_items(events, spec)
+    return None
+
+
 def swagger_to_tools(swagger_text):
     """
     Parse OpenAPI 3.0 or Swagger 2.0 specification and extract API endpoints as tools.
@@ -186,46 +498,86 @@ def swagger_to_tools(swagger_text):
     Raises:
         ValueError: If required fields are missing or spec is invalid
     """
-    try:
-        spec = json.loads(swagger_text)
-    except json.JSONDecodeError:
-        spec = yaml.safe_load(swagger_text)
+    models = {}
+    tools = list(swagger_to_tools_iter(swagger_text, models))
+    return tools, models
+
+
+def swagger_to_tools_iter(swagger_text, models=None):
+    """
+    Parse OpenAPI 3.0 or Swagger 2.0 specification, yielding one tool per endpoint.
+    Tools are yielded as soon as their operation is parsed, so callers can start
+    emitting code before the whole spec has been walked.
+    
+    Args:
+        swagger_text (str): OpenAPI/Swagger specification as JSON or YAML
+        models (dict): Empty dict filled in place with Pydantic model definitions;
+            every model a yielded tool references is registered before it is yielded
+    
+    Yields:
+        dict: Tool definition for one API endpoint
+    
+    Raises:
+        ValueError: If required fields are missing or spec is invalid
+    """
+    if models is None:
+        models = {}
+
+    spec = None
+    path_items = None
+    if _JSON_START_RE.match(swagger_text):
+        streamed_spec = None
+        if ijson is not None and len(swagger_text) > _STREAM_THRESHOLD:
+            try:
+                streamed_spec = _load_streamed_spec(swagger_text)
+            except ijson.JSONError:
+                pass
+        if streamed_spec is not None:
+            spec, path_items = streamed_spec
+        else:
+            try:
+                spec = _json_loads(swagger_text)
+            except ValueError:
+                pass
+    if spec is None:
+        spec = yaml.load(swagger_text, Loader=_YamlLoader)
     
     if spec is None:
-        return [], {}
+        return
 
-    tools = []
-    models = {}
-    model_hash_map = {}  # Track: hash -> canonical model name
+    model_hash_map = {}  # Track: sorted fields tuple -> canonical model name
+    name_counters = {}  # resource name -> next numeric suffix for colliding models
+    ref_cache = {}  # $ref path -> resolved schema, shared by all lookups in this parse
+    type_cache = {}  # id(schema) -> Python type string
+    fields_cache = {}  # id(schema) -> {field_name: type}
     base_url = ""
     security_schemes = {}
 
     is_openapi = "openapi" in spec
 
+    # Index the component schemas up front so their refs resolve in one lookup;
+    # any other local ref still goes through the path walk in _resolve_schema_ref
+    if is_openapi:
+        ref_prefix = "#/components/schemas/"
+        schema_index = (spec.get("components") or {}).get("schemas") or {}
+    else:
+        ref_prefix = "#/definitions/"
+        schema_index = spec.get("definitions") or {}
+    for schema_name, component in schema_index.items():
+        if isinstance(component, dict):
+            ref_cache[ref_prefix + schema_name] = component
+
     # --- VALIDATION: Check required fields ---
     if is_openapi:
         # OpenAPI 3.0 requires servers field
         servers = spec.get("servers", [])
         if not servers or len(servers) == 0:
-            raise ValueError(
-                "❌ **OpenAPI spec missing 'servers' field**\n\n"
-                "OpenAPI 3.0 requires at least one server. Example:\n"
-                "```json\n"
-                '"servers": [{"url": "https://api.example.com/v1"}]\n'
-                "```\n\n"
-                "See: https://swagger.io/specification/#servers-object"
-            )
+            raise ValueError(_ERR_MISSING_SERVERS)
         base_url = servers[0].get("url", "")
         if not base_url:
-            raise ValueError(
-                "❌ **First server object has empty 'url'**\n\n"
-                "Provide a valid server URL. Example:\n"
-                "```json\n"
-                '"servers": [{"url": "https://api.example.com/v1"}]\n'
-                "```"
-            )
+            raise ValueError(_ERR_EMPTY_SERVER_URL)
         paths = spec.get("paths", {})
-        security_schemes = spec.get("components", {}).get("securitySchemes", {})
+        security_schemes = (spec.get("components") or {}).get("securitySchemes") or {}
     else:
         # Swagger 2.0 requires host, schemes, basePath
         host = spec.get("host", "")
@@ -234,33 +586,11 @@ def swagger_to_tools(swagger_text):
         
         # Validation: Check for required fields
         if not host:
-            raise ValueError(
-                "❌ **Swagger spec missing required 'host' field**\n\n"
-                "Add the 'host' field to your Swagger spec. Example:\n"
-                "```json\n"
-                '"host": "api.example.com",\n'
-                '"schemes": ["https"],\n'
-                '"basePath": "/v2.0"\n'
-                "```\n\n"
-                "See: https://swagger.io/specification/v2/#fixed-fields"
-            )
+            raise ValueError(_ERR_MISSING_HOST)
         if not schemes or len(schemes) == 0:
-            raise ValueError(
-                "❌ **Swagger spec missing 'schemes' field**\n\n"
-                "Specify the protocol scheme. Example:\n"
-                "```json\n"
-                '"schemes": ["https"]\n'
-                "```"
-            )
+            raise ValueError(_ERR_MISSING_SCHEMES)
         if "basePath" not in spec:
-            raise ValueError(
-                "❌ **Swagger spec missing 'basePath' field**\n\n"
-                "Add the base path for your API. Example:\n"
-                "```json\n"
-                '"basePath": "/v2.0"\n'
-                "```\n\n"
-                "If your API has no version path, use: `\"basePath\": \"/\"`"
-            )
+            raise ValueError(_ERR_MISSING_BASE_PATH)
         
         # Construct base_url with validation 
         base_url = f"{schemes[0]}://{host}{base_path}"
@@ -270,43 +600,74 @@ def swagger_to_tools(swagger_text):
     auth_type = "None"
     auth_env = ""
 
+    # The first supported scheme wins; later ones are not consulted
     for name, scheme in security_schemes.items():
-        if scheme.get("type") == "http" and scheme.get("scheme") == "bearer":
+        scheme_type = scheme.get("type")
+        if scheme_type == "http" and scheme.get("scheme") == "bearer":
             auth_type = "Bearer Token"
             auth_env = name.upper() + "_TOKEN"
-        elif scheme.get("type") == "apiKey":
+            break
+        if scheme_type == "apiKey":
             auth_type = "API Key (Header)"
             auth_env = scheme.get("name", name).upper()
+            break
+
+    streamed = path_items is not None
+    if path_items is None:
+        path_items = paths.items()
+
+    for path, methods in path_items:
+        if streamed:
+            # Each streamed path item is freed once processed and its schemas' ids
+            # get reused, so id-keyed entries must not outlive it
+            type_cache.clear()
+            fields_cache.clear()
+        # Path items that are null/malformed have no operations to offer
+        if not isinstance(methods, dict):
+            continue
+        # Shared by every operation of this path
+        full_url = base_url + path
+        path_slug = None  # built on first operation without an operationId
 
-    for path, methods in paths.items():
         for method, details in methods.items():
-            if method.lower() not in ["get", "post", "put", "delete", "patch"]:
+            # Mixed-case keys ("Get") are rare enough to pay for .lower()
+            method_upper = _HTTP_METHODS.get(method) or _HTTP_METHODS.get(method.lower())
+            if method_upper is None:
                 continue
 
-            tool_name = details.get(
-                "operationId",
-                f"{method}_{path.strip('/').replace('/', '_').replace('{','').replace('}','')}"
-            )
+            # Everything the operation needs from its dict, looked up once
+            tool_name = details.get("operationId")
+            parameters = details.get("parameters") or ()
+            request_body = details.get("requestBody") if is_openapi else None
+            responses = details.get("responses")
+            summary = details.get("summary")
 
-            args = OrderedDict()
+            if tool_name is None:
+                if path_slug is None:
+                    path_slug = path.strip('/').translate(_PATH_TRANS)
+                tool_name = f"{method}_{path_slug}"
+            # Model name stem shared by the body and response branches
+            resource_name = tool_name.rsplit('_', 1)[-1].title()  # "get_user" -> "User"
+
+            args = {}
             body_model = None
             body_fields = {}
             has_body = False
             has_query_params = False
 
             # Parse parameters (Swagger 2.0 + OpenAPI 3.0 params)
-            for param in details.get("parameters", []):
+            for param in parameters:
                 p_name = param.get("name")
                 p_in = param.get("in")
 
-                if p_in in ["path", "query", "header"]:
+                if p_in in _SIMPLE_PARAM_LOCATIONS:
                     # Extract type from param schema or direct type field
                     param_schema = param.get("schema", {})
                     if param_schema:
-                        param_type = _map_schema_to_type(param_schema, spec, is_openapi)
+                        param_type = _map_schema_to_type(param_schema, spec, is_openapi, ref_cache, type_cache)
                     elif param.get("type") == "array" and "items" in param:
                         # Swagger 2.0: array parameter with items at parameter level
-                        param_type = _map_schema_to_type(param, spec, is_openapi=False)
+                        param_type = _map_schema_to_type(param, spec, False, ref_cache, type_cache)
                     else:
                         # Swagger 2.0: non-array type directly on parameter
                         raw_type = param.get("type", "str")
@@ -320,22 +681,22 @@ def swagger_to_tools(swagger_text):
                     # Swagger 2.0: body parameter with schema
                     has_body = True
                     body_schema = param.get("schema", {})
-                    body_fields = _extract_schema_fields(body_schema, spec, is_openapi)
+                    # Copied: formData params below may add to body_fields
+                    body_fields = dict(_extract_schema_fields(body_schema, spec, is_openapi, ref_cache, type_cache, fields_cache))
                 elif p_in == "formData":
                     # Swagger 2.0: form data parameters
                     has_body = True
                     if param.get("type") == "array" and "items" in param:
                         # Array field with items at parameter level
-                        param_type = _map_schema_to_type(param, spec, is_openapi=False)
+                        param_type = _map_schema_to_type(param, spec, False, ref_cache, type_cache)
                     else:
                         raw_type = param.get("type", "str")
                         param_type = _normalize_type(raw_type)
                     body_fields[p_name] = param_type
 
             # OpenAPI 3.0: requestBody
-            if is_openapi and "requestBody" in details:
+            if request_body is not None:
                 has_body = True
-                request_body = details["requestBody"]
                 content = request_body.get("content", {})
                 
                 # Prefer application/json, fallback to first available
@@ -346,96 +707,43 @@ def swagger_to_tools(swagger_text):
                     first_content = next(iter(content.values()), {})
                     schema = first_content.get("schema", {})
                 
-                body_fields = _extract_schema_fields(schema, spec, is_openapi)
+                body_fields = _extract_schema_fields(schema, spec, is_openapi, ref_cache, type_cache, fields_cache)
 
             # Create Pydantic model if body exists
             # Include model even if body_fields is empty - it's still a request body
             if has_body:
                 if body_fields:
-                    # Normalize all field types to valid Python types
-                    normalized_fields = {}
-                    for field_name, field_type in body_fields.items():
-                        normalized_fields[field_name] = _normalize_type(field_type) if isinstance(field_type, str) else field_type
-                    
-                    # Check if this schema already exists (deduplication)
-                    schema_hash = _normalize_schema_for_comparison(normalized_fields)
-                    if schema_hash in model_hash_map:
-                        # Reuse existing model
-                        body_model = model_hash_map[schema_hash]
-                    else:
-                        # Create new canonical model with resource-based name
-                        # Extract resource name from tool name (e.g., "get_user" -> "User")
-                        resource_name = tool_name.split('_')[-1].title() if '_' in tool_name else tool_name.title()
-                        model_name = resource_name
-                        
-                        # Ensure unique name if collision
-                        counter = 1
-                        while model_name in models:
-                            model_name = f"{resource_name}{counter}"
-                            counter += 1
-                        
-                        models[model_name] = normalized_fields
-                        model_hash_map[schema_hash] = model_name
-                        body_model = model_name
-                    
+                    body_model = _register_model(body_fields, resource_name, models, model_hash_map, name_counters)
                     args["body"] = body_model
                 else:
-                    # Empty body_fields but has_body=True means there's a body schema
-                    # Try to create a generic model
-                    model_name = f"{tool_name.title().replace('_','')}Request"
-                    models[model_name] = {"data": "dict"}
-                    args["body"] = model_name
-                    body_model = model_name
+                    # Empty body_fields but has_body=True means there's a body schema;
+                    # all such bodies share one generic model
+                    body_model = _register_model({"data": "dict"}, _GENERIC_MODEL, models, model_hash_map, name_counters)
+                    args["body"] = body_model
 
             # Extract response schema for typed responses
-            response_schema = _extract_response_schema(details.get("responses", {}), spec, is_openapi)
+            response_schema = _extract_response_schema(responses, spec, is_openapi)
             response_model = None
             response_fields = {}
             
             if response_schema:
-                response_fields = _extract_schema_fields(response_schema, spec, is_openapi)
+                response_fields = _extract_schema_fields(response_schema, spec, is_openapi, ref_cache, type_cache, fields_cache)
                 if response_fields:
-                    normalized_response_fields = {}
-                    for field_name, field_type in response_fields.items():
-                        normalized_response_fields[field_name] = _normalize_type(field_type) if isinstance(field_type, str) else field_type
-                    
-                    # Check if this schema already exists (deduplication)
-                    response_hash = _normalize_schema_for_comparison(normalized_response_fields)
-                    if response_hash in model_hash_map:
-                        # Reuse existing model
-                        response_model = model_hash_map[response_hash]
-                    else:
-                        # Create new canonical model
-                        resource_name = tool_name.split('_')[-1].title() if '_' in tool_name else tool_name.title()
-                        model_name = resource_name
-                        
-                        # Ensure unique name if collision
-                        counter = 1
-                        while model_name in models:
-                            model_name = f"{resource_name}{counter}"
-                            counter += 1
-                        
-                        models[model_name] = normalized_response_fields
-                        model_hash_map[response_hash] = model_name
-                        response_model = model_name
+                    response_model = _register_model(response_fields, resource_name, models, model_hash_map, name_counters)
                 else:
-                    # Empty response fields but has schema - create generic response model
-                    model_name = f"{tool_name.title().replace('_','')}Response"
-                    models[model_name] = {"data": "dict"}
-                    response_model = model_name
+                    # Empty response fields but has schema - reuse the shared generic model
+                    response_model = _register_model({"data": "dict"}, _GENERIC_MODEL, models, model_hash_map, name_counters)
 
-            tools.append({
+            yield {
                 "name": tool_name,
-                "url": base_url + path,
-                "method": method.upper(),
+                "url": full_url,
+                "method": method_upper,
                 "auth": auth_type,
                 "auth_val": auth_env,
-                "args": dict(args),
+                "args": args,
                 "body_model": body_model,
                 "response_model": response_model,
-                "has_file_fields": body_model and any(field_name == "file" for field_name in body_fields.keys()),
+                "has_file_fields": bool(body_model) and "file" in body_fields,
                 "has_query_params": has_query_params,
-                "desc": details.get("summary", f"{method.upper()} {path}")
-            })
-
-    return tools, models
+                "desc": summary if summary is not None else f"{method_upper} {path}"
+            }